@@ -5,7 +5,9 @@
 #include <iostream>
 #include <random>
 #include <algorithm>
+#include <chrono>
 #include <cmath>
+#include <sys/resource.h>
 
 int App::run(const InferenceArgs& args) {
     try {
@@ -33,13 +35,38 @@ int App::run(const InferenceArgs& args) {
             std::cout << "Prompt: " << args.prompt << std::endl;
         }
 
+        if (args.benchmark_stdin) {
+            // Serve newline-delimited prompts from stdin against the
+            // already-loaded model, one JSON metrics line per prompt, so
+            // callers amortize model load across many runs
+            std::string prompt;
+            while (std::getline(std::cin, prompt)) {
+                if (prompt.empty()) {
+                    continue;
+                }
+                InferenceArgs request = args;
+                request.prompt = prompt;
+
+                GenerationMetrics metrics;
+                generate(request, tokenizer, transformer, &metrics);
+                print_json_metrics(metrics);
+            }
+            return 0;
+        }
+
         // Generate tokens
-        auto generated_tokens = generate(args);
+        GenerationMetrics metrics;
+        auto generated_tokens = generate(args, tokenizer, transformer, &metrics);
 
         // Decode and print result
         std::string generated_text = tokenizer.decode(generated_tokens);
         std::cout << "\nGenerated text: " << generated_text << std::endl;
 
+        if (args.json_metrics) {
+            // Keep this as the last stdout line; benchmark.py parses it
+            print_json_metrics(metrics);
+        }
+
         return 0;
 
     } catch (const std::exception& e) {
@@ -48,13 +75,22 @@ int App::run(const InferenceArgs& args) {
     }
 }
 
-std::vector<int> App::generate(const InferenceArgs& args) {
-    // Initialize tokenizer and transformer (simplified for this demo)
-    Tokenizer tokenizer("dummy_tokenizer.model");
-    auto weights = load_onnx_initializers(args.model_path);
-    ModelWeights model_weights{weights};
-    Transformer transformer(model_weights);
+void App::print_json_metrics(const GenerationMetrics& metrics) {
+    long rss_kb = 0;
+    struct rusage usage;
+    if (getrusage(RUSAGE_SELF, &usage) == 0) {
+        rss_kb = usage.ru_maxrss;
+    }
+    std::cout << "{\"prefill_ms\":" << metrics.prefill_ms
+              << ",\"decode_ms\":" << metrics.decode_ms
+              << ",\"tokens\":" << metrics.generated_tokens
+              << ",\"rss_kb\":" << rss_kb << "}" << std::endl;
+}
 
+std::vector<int> App::generate(const InferenceArgs& args,
+                               Tokenizer& tokenizer,
+                               Transformer& transformer,
+                               GenerationMetrics* metrics) {
     // Encode prompt
     auto input_tokens = tokenizer.encode(args.prompt);
 
@@ -72,6 +108,10 @@ std::vector<int> App::generate(const InferenceArgs& args) {
     std::mt19937 gen(args.seed >= 0 ? args.seed : std::random_device{}());
     std::uniform_real_distribution<float> dist(0.0f, 1.0f);
 
+    using Clock = std::chrono::steady_clock;
+    auto t_start = Clock::now();
+    auto t_first_token = t_start;
+
     // Autoregressive generation
     for (int step = 0; step < args.max_tokens; ++step) {
         // Create input tensor for current sequence
@@ -110,6 +150,11 @@ std::vector<int> App::generate(const InferenceArgs& args) {
         // Sample next token
         int next_token = sample_token(last_logits, args);
 
+        // First step carries the prefill cost; everything after is decode
+        if (step == 0) {
+            t_first_token = Clock::now();
+        }
+
         // Check for EOS
         if (next_token == tokenizer.eos_token_id()) {
             break;
@@ -123,6 +168,15 @@ std::vector<int> App::generate(const InferenceArgs& args) {
         }
     }
 
+    if (metrics) {
+        auto t_end = Clock::now();
+        using ms = std::chrono::duration<double, std::milli>;
+        metrics->prefill_ms = ms(t_first_token - t_start).count();
+        metrics->decode_ms = ms(t_end - t_first_token).count();
+        metrics->generated_tokens =
+            static_cast<int>(all_tokens.size() - input_tokens.size());
+    }
+
     return all_tokens;
 }
 
@@ -204,5 +258,7 @@ void App::print_usage(const char* program_name) {
               << "  --top-p F          Top-p (nucleus) sampling parameter (default: 0.9)\n"
               << "  --seed N           Random seed (-1 for random, default: -1)\n"
               << "  --verbose          Enable verbose output\n"
+              << "  --json-metrics     Print a JSON metrics line after generation\n"
+              << "  --benchmark-stdin  Read prompts from stdin, one metrics line each\n"
               << "  --help             Show this help message\n";
 }
@@ -13,15 +13,32 @@ struct InferenceArgs {
     float top_p = 0.9f;
     int seed = -1;
     bool verbose = false;
+    bool json_metrics = false;
+    bool benchmark_stdin = false;
 };
 
+// Timing collected during generation, reported via --json-metrics so
+// tools/benchmark.py can parse real engine numbers from stdout.
+struct GenerationMetrics {
+    double prefill_ms = 0.0;
+    double decode_ms = 0.0;
+    int generated_tokens = 0;
+};
+
+class Tokenizer;
+class Transformer;
+
 class App {
 public:
     static int run(const InferenceArgs& args);
 
 private:
-    static std::vector<int> generate(const InferenceArgs& args);
+    static std::vector<int> generate(const InferenceArgs& args,
+                                     Tokenizer& tokenizer,
+                                     Transformer& transformer,
+                                     GenerationMetrics* metrics);
     static int sample_token(const std::vector<float>& logits, const InferenceArgs& args);
+    static void print_json_metrics(const GenerationMetrics& metrics);
     static void print_usage(const char* program_name);
 };
 
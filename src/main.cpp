@@ -94,6 +94,10 @@ InferenceArgs parse_args(int argc, char* argv[]) {
             args.seed = std::stoi(argv[++i]);
         } else if (arg == "--verbose") {
             args.verbose = true;
+        } else if (arg == "--json-metrics") {
+            args.json_metrics = true;
+        } else if (arg == "--benchmark-stdin") {
+            args.benchmark_stdin = true;
         } else if (arg == "--help") {
             App::print_usage(argv[0]);
             exit(0);
@@ -111,7 +115,7 @@ InferenceArgs parse_args(int argc, char* argv[]) {
         exit(1);
     }
 
-    if (args.prompt.empty()) {
+    if (args.prompt.empty() && !args.benchmark_stdin) {
         std::cerr << "Error: --prompt is required" << std::endl;
         App::print_usage(argv[0]);
         exit(1);
@@ -0,0 +1,63 @@
+/*
+ * AVX2 nibble-packing kernel for Q4 quantization.
+ *
+ * Packs pairs of 4-bit signed quants (stored one per int8) into single
+ * bytes: out[i] = (q[2i] & 0x0F) | ((q[2i+1] & 0x0F) << 4).
+ *
+ * Build as a shared library next to quantize_model.py:
+ *   cc -O3 -mavx2 -shared -fPIC -o _q4pack.so _q4pack.c
+ *
+ * quantize_model.py loads this via ctypes when present and falls back to
+ * the pure NumPy packer otherwise, so building it is optional.
+ */
+
+#include <stddef.h>
+#include <stdint.h>
+
+#ifdef __AVX2__
+#include <immintrin.h>
+#endif
+
+static void pack_q4_scalar(const int8_t* q, uint8_t* out, size_t n) {
+    for (size_t i = 0; i + 1 < n; i += 2) {
+        out[i / 2] = (uint8_t)((q[i] & 0x0F) | ((q[i + 1] & 0x0F) << 4));
+    }
+    if (n & 1) {
+        out[n / 2] = (uint8_t)(q[n - 1] & 0x0F);
+    }
+}
+
+/* Pack n int8 quants into (n+1)/2 bytes. */
+void pack_q4(const int8_t* q, uint8_t* out, size_t n) {
+#ifdef __AVX2__
+    /* Each 16-bit lane holds [even quant | odd quant << 8]. Masking the
+     * nibbles and shifting the odd quant down by 4 leaves the packed byte
+     * in the low half of every lane; packus then collapses two registers
+     * (64 quants) into 32 output bytes per iteration. */
+    const __m256i nib_lo = _mm256_set1_epi16(0x000F);
+    const __m256i nib_hi = _mm256_set1_epi16(0x00F0);
+    size_t i = 0;
+
+    for (; i + 64 <= n; i += 64) {
+        __m256i a = _mm256_loadu_si256((const __m256i*)(q + i));
+        __m256i b = _mm256_loadu_si256((const __m256i*)(q + i + 32));
+
+        __m256i pa = _mm256_or_si256(
+            _mm256_and_si256(a, nib_lo),
+            _mm256_and_si256(_mm256_srli_epi16(a, 4), nib_hi));
+        __m256i pb = _mm256_or_si256(
+            _mm256_and_si256(b, nib_lo),
+            _mm256_and_si256(_mm256_srli_epi16(b, 4), nib_hi));
+
+        /* packus interleaves 128-bit halves; permute restores order. */
+        __m256i packed = _mm256_packus_epi16(pa, pb);
+        packed = _mm256_permute4x64_epi64(packed, 0xD8);
+
+        _mm256_storeu_si256((__m256i*)(out + i / 2), packed);
+    }
+
+    pack_q4_scalar(q + i, out + i / 2, n - i);
+#else
+    pack_q4_scalar(q, out, n);
+#endif
+}
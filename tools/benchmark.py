@@ -7,68 +7,251 @@ metrics for tokens/sec, latency, and memory usage.
 """
 
 import argparse
+import resource
+import sys
+import threading
 import time
-import psutil
 import json
+import numpy as np
 import subprocess
 from pathlib import Path
 
 
+def child_peak_rss_mb() -> float:
+    """
+    Peak RSS across all child processes so far, in MB.
+
+    A single getrusage call per run replaces per-iteration /proc reads;
+    ru_maxrss is kilobytes on Linux and bytes on macOS.
+    """
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    if sys.platform == "darwin":
+        return usage.ru_maxrss / (1024 * 1024)
+    return usage.ru_maxrss / 1024
+
+
+def _sample_child_rss(proc, hz: float, samples: list):
+    """Poll /proc/<pid>/status VmRSS at `hz` while the child runs."""
+    period = 1.0 / hz
+    status_path = f"/proc/{proc.pid}/status"
+    while proc.poll() is None:
+        try:
+            with open(status_path) as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        samples.append(int(line.split()[1]))  # kB
+                        break
+        except OSError:
+            break
+        time.sleep(period)
+
+
+def current_git_sha() -> str:
+    """Return the current git commit SHA, or 'unknown' outside a repo."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], text=True,
+            stderr=subprocess.DEVNULL
+        ).strip()
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return "unknown"
+
+
+def _next_metrics(stdout) -> dict:
+    """
+    Read engine stdout until the next JSON metrics line.
+
+    The engine prints human-readable progress too; metrics lines are the
+    ones that parse as JSON objects, e.g.
+        {"prefill_ms": ..., "decode_ms": ..., "tokens": ..., "rss_kb": ...}
+    """
+    for line in stdout:
+        line = line.strip()
+        if line.startswith("{"):
+            try:
+                return json.loads(line)
+            except json.JSONDecodeError:
+                continue
+    raise RuntimeError("engine exited before emitting a metrics line")
+
+
+def prepare_specialized_model(model_path: str, tile_size: int,
+                              provider: str = "CPUExecutionProvider") -> bool:
+    """
+    Build (or reuse) the cached sequence-length-specialized session for
+    the model before any measured run.
+
+    Delegates to convert_model.create_specialized_session, which pins the
+    free dimensions to tile_size and persists the optimized artifact under
+    ~/.cache/helios keyed by (model sha, provider, tile_size). Doing this
+    up front keeps provider recompilation out of the measured loop.
+
+    Specialization is best-effort: any failure is reported and the
+    benchmark proceeds against the unspecialized model.
+    """
+    try:
+        from convert_model import create_specialized_session
+    except ImportError as e:
+        # convert_model pulls in torch/onnx at import time, so this can
+        # fire even when onnxruntime itself is installed
+        print(f"Cannot import convert_model ({e}); skipping session specialization")
+        return False
+
+    try:
+        create_specialized_session(model_path, tile_size, provider)
+        return True
+    except Exception as e:
+        print(f"Session specialization failed ({e}); continuing unspecialized")
+        return False
+
+
 def run_inference_benchmark(model_path: str, prompt: str, max_tokens: int = 50,
-                          num_runs: int = 5) -> dict:
+                          num_runs: int = 5,
+                          engine_binary: str = "build/infer",
+                          warmup: int = 2,
+                          sample_rss_hz: float = 0.0) -> dict:
     """
-    Run inference benchmarks and collect performance metrics.
+    Run inference benchmarks against the engine binary and collect
+    performance metrics.
 
-    Note: This is a placeholder that would integrate with the actual
-    C++ inference engine binary.
+    The first `warmup` invocations are discarded: cold-start costs (model
+    load, allocator init) can dwarf warm inference time and would swamp
+    the statistics. Results carry the current git SHA so runs can be
+    compared across commits.
+
+    A single engine process (--benchmark-stdin) serves every run: prompts
+    are streamed over stdin and one JSON metrics line is read back per
+    prompt, so model load is paid once instead of once per run.
     """
 
     print(f"Benchmarking model: {model_path}")
+    print(f"Engine binary: {engine_binary}")
     print(f"Prompt: {prompt}")
     print(f"Max tokens: {max_tokens}")
-    print(f"Number of runs: {num_runs}")
+    print(f"Number of runs: {num_runs} (+{warmup} warmup)")
 
-    # Placeholder results - in real implementation would run the C++ binary
     results = {
         "model_path": model_path,
+        "engine_binary": engine_binary,
+        "git_sha": current_git_sha(),
         "prompt": prompt,
         "max_tokens": max_tokens,
         "runs": num_runs,
+        "warmup": warmup,
         "results": []
     }
 
-    # Simulate benchmark runs
-    for i in range(num_runs):
-        start_time = time.time()
+    # Structure-of-arrays: one preallocated column per metric instead of a
+    # dict per run, so aggregation below is vectorized C instead of
+    # O(num_runs) Python traversals
+    prefill_ms = np.empty(num_runs, np.float64)
+    decode_ms = np.empty(num_runs, np.float64)
+    tokens = np.empty(num_runs, np.int64)
+    total_times = np.empty(num_runs, np.float64)
+    memory_mb = np.empty(num_runs, np.float64)
 
-        # Simulate inference time (would be actual binary execution)
-        inference_time = 0.1 + (i * 0.05)  # Simulated variable time
-        time.sleep(inference_time)
+    proc = subprocess.Popen(
+        [
+            engine_binary,
+            "--benchmark-stdin",
+            "--model", model_path,
+            "--max-tokens", str(max_tokens),
+            "--json-metrics",
+        ],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        # stderr is inherited: nothing reads it here, so piping it would
+        # deadlock a chatty engine once the pipe buffer fills, and engine
+        # error messages are most useful straight on the terminal
+        stderr=None,
+        text=True,
+        bufsize=1,
+    )
 
-        end_time = time.time()
+    sampler = None
+    rss_samples = []
+    if sample_rss_hz > 0:
+        sampler = threading.Thread(
+            target=_sample_child_rss, args=(proc, sample_rss_hz, rss_samples),
+            daemon=True
+        )
+        sampler.start()
 
-        run_result = {
-            "run": i + 1,
-            "inference_time": inference_time,
-            "tokens_per_sec": max_tokens / inference_time,
-            "total_time": end_time - start_time,
-            "memory_mb": psutil.Process().memory_info().rss / 1024 / 1024
-        }
+    try:
+        for i in range(warmup):
+            proc.stdin.write(prompt + "\n")
+            proc.stdin.flush()
+            _next_metrics(proc.stdout)
+            print(f"Warmup {i+1}/{warmup} done")
+
+        for i in range(num_runs):
+            start_time = time.time()
+            proc.stdin.write(prompt + "\n")
+            proc.stdin.flush()
+            metrics = _next_metrics(proc.stdout)
+            end_time = time.time()
+
+            prefill_ms[i] = metrics["prefill_ms"]
+            decode_ms[i] = metrics["decode_ms"]
+            tokens[i] = metrics["tokens"]
+            total_times[i] = end_time - start_time
+            memory_mb[i] = metrics["rss_kb"] / 1024
 
-        results["results"].append(run_result)
-        print(f"Run {i+1}: {inference_time".3f"}s, {run_result['tokens_per_sec']".1f"} tokens/sec")
+            inference_time = (prefill_ms[i] + decode_ms[i]) / 1000.0
+            rate = tokens[i] / inference_time if inference_time > 0 else 0.0
+            print(f"Run {i+1}: {inference_time:.3f}s, {rate:.1f} tokens/sec")
+    finally:
+        proc.stdin.close()
+        proc.wait()
+        if sampler is not None:
+            sampler.join()
 
-    # Calculate statistics
-    times = [r["inference_time"] for r in results["results"]]
-    token_rates = [r["tokens_per_sec"] for r in results["results"]]
+    # Derived columns, all vectorized
+    times = (prefill_ms + decode_ms) / 1000.0
+    token_rates = np.divide(tokens, times,
+                            out=np.zeros(num_runs), where=times > 0)
+    # Time-to-first-token (prefill bound) and time-per-output-token
+    # (decode bound) move independently; track both
+    ttft_ms = prefill_ms
+    tpot_ms = decode_ms / np.maximum(tokens - 1, 1)
+
+    # The JSON-friendly per-run records are built once at the end from
+    # the arrays
+    results["results"] = [
+        {
+            "run": i + 1,
+            "inference_time": float(times[i]),
+            "prefill_ms": float(prefill_ms[i]),
+            "decode_ms": float(decode_ms[i]),
+            "tokens": int(tokens[i]),
+            "tokens_per_sec": float(token_rates[i]),
+            "ttft_ms": float(ttft_ms[i]),
+            "tpot_ms": float(tpot_ms[i]),
+            "total_time": float(total_times[i]),
+            "memory_mb": float(memory_mb[i]),
+        }
+        for i in range(num_runs)
+    ]
 
+    # Calculate statistics: median and p95 rather than the mean, which a
+    # single outlier run would drag around
     results["stats"] = {
-        "avg_inference_time": sum(times) / len(times),
-        "avg_tokens_per_sec": sum(token_rates) / len(token_rates),
-        "min_tokens_per_sec": min(token_rates),
-        "max_tokens_per_sec": max(token_rates),
-        "memory_peak_mb": max([r["memory_mb"] for r in results["results"]])
+        "median_inference_time": float(np.median(times)),
+        "p95_inference_time": float(np.percentile(times, 95)),
+        "median_tokens_per_sec": float(np.median(token_rates)),
+        "min_tokens_per_sec": float(token_rates.min()),
+        "max_tokens_per_sec": float(token_rates.max()),
+        "median_ttft_ms": float(np.median(ttft_ms)),
+        "p95_ttft_ms": float(np.percentile(ttft_ms, 95)),
+        "median_tpot_ms": float(np.median(tpot_ms)),
+        "p95_tpot_ms": float(np.percentile(tpot_ms, 95)),
+        "memory_peak_mb": float(memory_mb.max()),
+        # Kernel-tracked high-water mark across all engine invocations;
+        # catches spikes the engine's own final-RSS report can miss
+        "child_peak_rss_mb": child_peak_rss_mb()
     }
+    if rss_samples:
+        results["stats"]["sampled_peak_rss_mb"] = max(rss_samples) / 1024
 
     return results
 
@@ -99,6 +282,38 @@ def main():
         default=5,
         help="Number of benchmark runs"
     )
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=2,
+        help="Number of discarded warmup runs before measurement"
+    )
+    parser.add_argument(
+        "--engine-binary",
+        type=str,
+        default="build/infer",
+        help="Path to the compiled engine binary"
+    )
+    parser.add_argument(
+        "--tile-size",
+        type=int,
+        default=0,
+        help="Specialize the ONNX session to this fixed seq_len before "
+             "benchmarking (0 disables; cached under ~/.cache/helios)"
+    )
+    parser.add_argument(
+        "--provider",
+        type=str,
+        default="CPUExecutionProvider",
+        help="Execution provider used for session specialization"
+    )
+    parser.add_argument(
+        "--sample-rss-hz",
+        type=float,
+        default=0.0,
+        help="Poll the engine's RSS at this rate during each run "
+             "(0 disables the sampler)"
+    )
     parser.add_argument(
         "--output",
         type=str,
@@ -112,18 +327,35 @@ def main():
         print(f"Error: Model file not found: {args.model}")
         return 1
 
+    if not Path(args.engine_binary).exists():
+        print(f"Error: Engine binary not found: {args.engine_binary}")
+        print("Build it first: mkdir build && cd build && cmake .. && make")
+        return 1
+
+    # Specialize the session to a fixed seq_len (cached across launches)
+    # so dynamic-dimension recompilation never lands inside a measured run
+    if args.tile_size > 0:
+        prepare_specialized_model(args.model, args.tile_size, args.provider)
+
     # Run benchmarks
     results = run_inference_benchmark(
-        args.model, args.prompt, args.max_tokens, args.runs
+        args.model, args.prompt, args.max_tokens, args.runs,
+        args.engine_binary, args.warmup, args.sample_rss_hz
     )
 
     # Print summary
     stats = results["stats"]
     print("\n=== Benchmark Summary ===")
-    print(f"Average inference time: {stats['avg_inference_time']".3f"}s")
-    print(f"Average tokens/sec: {stats['avg_tokens_per_sec']".1f"}")
-    print(f"Peak memory usage: {stats['memory_peak_mb']".1f"} MB")
-    print(f"Range: {stats['min_tokens_per_sec']".1f"} - {stats['max_tokens_per_sec']".1f"} tokens/sec")
+    print(f"Git SHA: {results['git_sha']}")
+    print(f"Median inference time: {stats['median_inference_time']:.3f}s "
+          f"(p95: {stats['p95_inference_time']:.3f}s)")
+    print(f"Median tokens/sec: {stats['median_tokens_per_sec']:.1f}")
+    print(f"TTFT: {stats['median_ttft_ms']:.1f} ms median, "
+          f"{stats['p95_ttft_ms']:.1f} ms p95")
+    print(f"TPOT: {stats['median_tpot_ms']:.2f} ms median, "
+          f"{stats['p95_tpot_ms']:.2f} ms p95")
+    print(f"Peak memory usage: {stats['memory_peak_mb']:.1f} MB")
+    print(f"Range: {stats['min_tokens_per_sec']:.1f} - {stats['max_tokens_per_sec']:.1f} tokens/sec")
 
     # Save results if requested
     if args.output:
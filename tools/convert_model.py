@@ -9,6 +9,7 @@ This script provides tools to:
 """
 
 import argparse
+import hashlib
 import numpy as np
 import onnx
 from onnx import helper, TensorProto
@@ -17,7 +18,60 @@ import torch.nn as nn
 from pathlib import Path
 
 
-def create_test_onnx_model(output_path: str = "tests/golden_baselines/mini.onnx"):
+def create_specialized_session(model_path: str, tile_size: int = 64,
+                               provider: str = "CPUExecutionProvider",
+                               cache_dir: str = None):
+    """
+    Create an ONNX Runtime session specialized to a fixed sequence length,
+    reusing cached optimized artifacts across process launches.
+
+    Free dimensions are pinned via add_free_dimension_override_by_name so
+    providers compile kernels once for the given tile size, and the
+    optimized graph is persisted under the cache directory. Cache entries
+    are keyed on (sha256 of model bytes, provider, tile_size), so stale
+    artifacts invalidate automatically whenever any of those change.
+    """
+    import onnxruntime as ort  # deferred: only the session path needs it
+
+    # The bytes are only hashed for the cache key; the session itself is
+    # built from the path, since a bytes-loaded model resolves external
+    # data against the current working directory instead of its own
+    model_sha = hashlib.sha256(Path(model_path).read_bytes()).hexdigest()[:16]
+
+    cache_root = Path(cache_dir) if cache_dir else Path.home() / ".cache" / "helios"
+    cache_root.mkdir(parents=True, exist_ok=True)
+    cached_model = cache_root / f"{model_sha}-{provider}-s{tile_size}.ort"
+
+    sess_options = ort.SessionOptions()
+    sess_options.add_free_dimension_override_by_name("batch", 1)
+    sess_options.add_free_dimension_override_by_name("seq_len", tile_size)
+
+    provider_options = {}
+    if provider == "TensorrtExecutionProvider":
+        # TensorRT builds engines per shape; persist them alongside the
+        # optimized graph so reruns skip the rebuild entirely
+        trt_cache = cache_root / "trt"
+        trt_cache.mkdir(exist_ok=True)
+        provider_options = {
+            "trt_engine_cache_enable": "1",
+            "trt_engine_cache_path": str(trt_cache),
+        }
+
+    if cached_model.exists():
+        return ort.InferenceSession(
+            str(cached_model), sess_options,
+            providers=[(provider, provider_options)]
+        )
+
+    sess_options.optimized_model_filepath = str(cached_model)
+    return ort.InferenceSession(
+        str(model_path), sess_options,
+        providers=[(provider, provider_options)]
+    )
+
+
+def create_test_onnx_model(output_path: str = "tests/golden_baselines/mini.onnx",
+                           validate: bool = False):
     """
     Create a minimal ONNX model for testing the inference engine.
 
@@ -26,9 +80,14 @@ def create_test_onnx_model(output_path: str = "tests/golden_baselines/mini.onnx"
     - Embedding layer
     - Single transformer layer (attention + feedforward)
     - Output: logits (batch_size, seq_len, vocab_size)
+
+    Set validate=True to run onnx.checker over the result; it is off by
+    default because checking walks every node and initializer, which is
+    wasted work for a model we just built ourselves.
     """
 
     # Model parameters
+    rng = np.random.default_rng()
     batch_size = 1
     seq_len = 8
     hidden_size = 64
@@ -48,7 +107,7 @@ def create_test_onnx_model(output_path: str = "tests/golden_baselines/mini.onnx"
     )
 
     # Embedding weight (vocab_size, hidden_size)
-    embed_weight_data = np.random.randn(vocab_size, hidden_size).astype(np.float32)
+    embed_weight_data = rng.standard_normal((vocab_size, hidden_size), dtype=np.float32)
     embed_weight = helper.make_tensor(
         'embed_tokens.weight',
         TensorProto.FLOAT,
@@ -59,10 +118,10 @@ def create_test_onnx_model(output_path: str = "tests/golden_baselines/mini.onnx"
 
     # Attention weights
     # Q, K, V projections (hidden_size, hidden_size)
-    q_weight_data = np.random.randn(hidden_size, hidden_size).astype(np.float32)
-    k_weight_data = np.random.randn(hidden_size, hidden_size).astype(np.float32)
-    v_weight_data = np.random.randn(hidden_size, hidden_size).astype(np.float32)
-    o_weight_data = np.random.randn(hidden_size, hidden_size).astype(np.float32)
+    q_weight_data = rng.standard_normal((hidden_size, hidden_size), dtype=np.float32)
+    k_weight_data = rng.standard_normal((hidden_size, hidden_size), dtype=np.float32)
+    v_weight_data = rng.standard_normal((hidden_size, hidden_size), dtype=np.float32)
+    o_weight_data = rng.standard_normal((hidden_size, hidden_size), dtype=np.float32)
 
     q_weight = helper.make_tensor(
         'q_proj.weight', TensorProto.FLOAT, [hidden_size, hidden_size],
@@ -82,8 +141,8 @@ def create_test_onnx_model(output_path: str = "tests/golden_baselines/mini.onnx"
     )
 
     # Feedforward weights
-    fc1_weight_data = np.random.randn(hidden_size * 4, hidden_size).astype(np.float32)
-    fc2_weight_data = np.random.randn(hidden_size, hidden_size * 4).astype(np.float32)
+    fc1_weight_data = rng.standard_normal((hidden_size * 4, hidden_size), dtype=np.float32)
+    fc2_weight_data = rng.standard_normal((hidden_size, hidden_size * 4), dtype=np.float32)
 
     fc1_weight = helper.make_tensor(
         'fc1.weight', TensorProto.FLOAT, [hidden_size * 4, hidden_size],
@@ -117,7 +176,9 @@ def create_test_onnx_model(output_path: str = "tests/golden_baselines/mini.onnx"
     ]
 
     # LM head weight (vocab_size, hidden_size) - transpose of embedding
-    lm_head_weight_data = embed_weight_data.T  # Transpose for lm_head
+    # Make the transpose contiguous up front; .tobytes() on the view would
+    # silently copy anyway, so pay the cost once and visibly
+    lm_head_weight_data = np.ascontiguousarray(embed_weight_data.T)
     lm_head_weight = helper.make_tensor(
         'lm_head.weight',
         TensorProto.FLOAT,
@@ -150,17 +211,28 @@ def create_test_onnx_model(output_path: str = "tests/golden_baselines/mini.onnx"
     # Create the model
     model = helper.make_model(graph, producer_name='helios-engine')
 
-    # Validate and save
-    onnx.checker.check_model(model)
+    # Validate (opt-in) and save
+    if validate:
+        onnx.checker.check_model(model)
 
     # Ensure output directory exists
     Path(output_path).parent.mkdir(parents=True, exist_ok=True)
 
-    with open(output_path, 'wb') as f:
-        f.write(model.SerializeToString())
+    # External data keeps initializer bytes out of the protobuf: no extra
+    # serialized copy in memory, and the weights sidecar is a contiguous
+    # blob the engine can mmap
+    onnx.save_model(
+        model, output_path,
+        save_as_external_data=True,
+        all_tensors_to_one_file=True,
+        location=Path(output_path).name + ".weights.bin",
+        size_threshold=1024,
+    )
 
+    weights_file = Path(output_path).with_name(Path(output_path).name + ".weights.bin")
     print(f"Created test ONNX model: {output_path}")
-    print(f"Model size: {Path(output_path).stat().st_size} bytes")
+    print(f"Model size: {Path(output_path).stat().st_size} bytes "
+          f"(+ {weights_file.stat().st_size} bytes external data)")
     print(f"Initializer count: {len(model.graph.initializer)}")
 
     return model
@@ -203,11 +275,16 @@ def main():
         default="tests/golden_baselines/mini.onnx",
         help="Output path for created model"
     )
+    parser.add_argument(
+        "--validate",
+        action="store_true",
+        help="Run onnx.checker over the created model"
+    )
 
     args = parser.parse_args()
 
     if args.create_test_model:
-        create_test_onnx_model(args.output)
+        create_test_onnx_model(args.output, args.validate)
     elif args.inspect:
         inspect_onnx_model(args.inspect)
     else:
